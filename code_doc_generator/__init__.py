@@ -1,7 +1,21 @@
-from .analyzer import CodeAnalyzer
-from .ai_engine import AIDocumentationEngine
-from .visual_generator import VisualGraphGenerator
-from .doc_generator import EnhancedDocumentationGenerator
+import importlib
+
 from .cli import main
 
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+# Resolved on first access (PEP 562), so the CLI's --help doesn't import the analysis stack
+_LAZY_ATTRIBUTES = {
+    'CodeAnalyzer': '.analyzer',
+    'AIDocumentationEngine': '.ai_engine',
+    'VisualGraphGenerator': '.visual_generator',
+    'EnhancedDocumentationGenerator': '.doc_generator'
+}
+
+__all__ = [*_LAZY_ATTRIBUTES, 'main']
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,126 +1,354 @@
+import ast
+import hashlib
 import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import re
-from typing import List, Dict, Set
+import warnings
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple, Union
+
+# Supported source extensions and their language; the walk and language detection share it
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript',
+    '.jsx': 'React JSX', '.tsx': 'React TSX', '.java': 'Java',
+    '.cpp': 'C++', '.c': 'C', '.h': 'C/C++ Header',
+    '.cs': 'C#', '.php': 'PHP', '.rb': 'Ruby',
+    '.go': 'Go', '.rs': 'Rust', '.kt': 'Kotlin',
+    '.swift': 'Swift', '.dart': 'Dart'
+}
+
+JS_EXTENSIONS = ('.js', '.ts', '.jsx', '.tsx')
+
+# Default size limit for analyzed files; larger ones are usually generated or minified
+MAX_FILE_BYTES = 2 * 1024 * 1024
+
+# Bytes checked for NUL characters to tell binary files from source
+BINARY_SNIFF_BYTES = 512
+
+# Dependency manifests reported by detect_build_files
+BUILD_FILE_NAMES = frozenset({'requirements.txt', 'package.json', 'pyproject.toml'})
+
+# Root of the on-disk cache; per-project analyses live under CACHE_DIR / 'analysis'
+CACHE_DIR = Path.home() / '.cache' / 'code_doc_generator'
+
+# Bump when analyze_file's output changes so cached analyses are discarded
+ANALYSIS_CACHE_VERSION = 3
+
+# Below this many files analyze_all stays in-process; worker start-up would dominate
+PARALLEL_MIN_FILES = 32
+
+# Name-extraction regexes, compiled once and keyed by file extension.
+# They match raw bytes with ASCII delimiters, so files are never decoded as a whole
+FUNCTION_PATTERNS = {
+    '.py': (re.compile(rb'def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\('),),
+    **dict.fromkeys(JS_EXTENSIONS, (
+        re.compile(rb'function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\('),
+        re.compile(rb'const\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\('),
+        re.compile(rb'([a-zA-Z_][a-zA-Z0-9_]*)\s*=>\s*')
+    ))
+}
+
+CLASS_PATTERNS = {
+    '.py': (re.compile(rb'class\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[:\(]'),),
+    **dict.fromkeys(JS_EXTENSIONS, (re.compile(rb'class\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[{]'),))
+}
+
+IMPORT_PATTERNS = {
+    '.py': (
+        re.compile(rb'import\s+([a-zA-Z_][a-zA-Z0-9_.]*)'),
+        re.compile(rb'from\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s+import')
+    ),
+    **dict.fromkeys(JS_EXTENSIONS, (
+        re.compile(rb'import.*from\s+[\'"]([^\'"]+)[\'"]'),
+        re.compile(rb'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+    ))
+}
+
+# AST nodes that _python_names collects names from
+PYTHON_NAME_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Import, ast.ImportFrom)
+
+
+def _find_names(patterns: Tuple[re.Pattern, ...], content: Union[str, bytes]) -> List[str]:
+    """Collect the unique names matched by any of the patterns, in order of first match"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    names = {}
+    for pattern in patterns:
+        # Stream matches straight into the dict; findall would build a list of every repeat first
+        for match in pattern.finditer(content):
+            names[match.group(1)] = None
+    return [name.decode('utf-8', errors='ignore') for name in names]
+
+
+def _python_names(content: Union[str, bytes]) -> Optional[Tuple[List[str], List[str], List[str]]]:
+    """Functions, classes and imports of Python source in one AST walk; None if it doesn't parse"""
+    try:
+        # Compile warnings (e.g. invalid escape sequences) belong to the analyzed file, not this tool
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    functions, classes, imports = {}, {}, {}
+    # ast.walk is breadth-first; sorting by position keeps names in order of first appearance
+    nodes = sorted(
+        (node for node in ast.walk(tree) if isinstance(node, PYTHON_NAME_NODES)),
+        key=lambda node: (node.lineno, node.col_offset)
+    )
+    for node in nodes:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions[node.name] = None
+        elif isinstance(node, ast.ClassDef):
+            classes[node.name] = None
+        elif isinstance(node, ast.Import):
+            imports.update(dict.fromkeys(alias.name for alias in node.names))
+        elif isinstance(node, ast.ImportFrom):
+            # Relative imports keep their leading dots so callers can tell them apart
+            imports['.' * node.level + (node.module or '')] = None
+    return list(functions), list(classes), list(imports)
+
+
+def _content_key(file_path: Path, content: Optional[bytes] = None) -> Optional[Tuple[str, bytes]]:
+    """Suffix and content digest identifying files with the same analysis; None if unreadable"""
+    if content is None:
+        try:
+            content = file_path.read_bytes()
+        except OSError:
+            return None
+    return file_path.suffix, hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _file_stamp(file_path: Path) -> Optional[Tuple[int, int]]:
+    """Modification time and size of a file, or None if it can't be stat'ed"""
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
 
 class CodeAnalyzer:
-    SUPPORTED_EXTENSIONS = {
-        '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h',
-        '.cs', '.php', '.rb', '.go', '.rs', '.kt', '.swift', '.dart'
-    }
+    SUPPORTED_EXTENSIONS = frozenset(LANGUAGE_BY_EXTENSION)
 
-    IGNORE_DIRS = {
+    IGNORE_DIRS = frozenset({
         '.venv', 'venv', '.env', 'env', 'node_modules', '.git', '.idea',
         '__pycache__', '.pytest_cache', 'build', 'dist', 'target',
         '.gradle', '.mvn', 'bin', 'obj', '.vs', '.vscode', 'coverage',
         '.nyc_output', 'logs', 'log', '.log', 'temp', 'tmp', '.tmp'
-    }
+    })
 
-    IGNORE_FILES = {
+    IGNORE_FILES = frozenset({
         '.gitignore', '.env', '.env.local', '.env.development', '.env.production',
         'package-lock.json', 'yarn.lock', 'poetry.lock', 'Pipfile.lock',
         'requirements.txt', 'setup.py', 'setup.cfg', 'pyproject.toml',
         'LICENSE', 'README.md', 'CHANGELOG.md', '.DS_Store'
-    }
+    })
 
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, max_file_bytes: Optional[int] = MAX_FILE_BYTES):
         self.project_path = Path(project_path).resolve()
         self.project_name = self.project_path.name
+        # None disables the size limit
+        self.max_file_bytes = max_file_bytes
+        # File path -> (stamp, analysis), loaded from the disk cache on first use
+        self._analyses = None
+        # (suffix, content digest) -> analysis, so duplicated files are only parsed once
+        self._analyses_by_content = {}
+
+    def __getstate__(self):
+        # Worker processes only need the configuration, not the in-memory caches
+        state = self.__dict__.copy()
+        state['_analyses'] = None
+        state['_analyses_by_content'] = {}
+        return state
 
     def should_ignore_path(self, path: Path) -> bool:
-        for part in path.parts:
-            if part in self.IGNORE_DIRS:
-                return True
-        return path.name in self.IGNORE_FILES
+        return not self.IGNORE_DIRS.isdisjoint(path.parts) or path.name in self.IGNORE_FILES
+
+    def _walk(self) -> Iterator[os.DirEntry]:
+        """Yield the non-directory entries under the project, pruning ignored directories"""
+        stack = [self.project_path]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.IGNORE_DIRS:
+                            stack.append(entry.path)
+                    else:
+                        yield entry
 
     def get_code_files(self) -> List[Path]:
-        code_files = []
-        for root, dirs, files in os.walk(self.project_path):
-            root_path = Path(root)
-            dirs[:] = [d for d in dirs if d not in self.IGNORE_DIRS]
-            for file in files:
-                file_path = root_path / file
-                if (not self.should_ignore_path(file_path) and
-                        file_path.suffix.lower() in self.SUPPORTED_EXTENSIONS):
-                    code_files.append(file_path)
-        return sorted(code_files)
+        # Ignored directories are pruned by _walk, so only names need checking here
+        return sorted(
+            Path(entry.path) for entry in self._walk()
+            if (entry.name not in self.IGNORE_FILES and
+                os.path.splitext(entry.name)[1].lower() in self.SUPPORTED_EXTENSIONS and
+                entry.is_file() and self._within_size_limit(entry))
+        )
+
+    def _within_size_limit(self, entry: os.DirEntry) -> bool:
+        if self.max_file_bytes is None:
+            return True
+        try:
+            return entry.stat().st_size <= self.max_file_bytes
+        except OSError:
+            return False
+
+    def analyze_all(self, files: Optional[Iterable[Path]] = None) -> Iterator[Dict]:
+        """Analyze files (by default all code files) in order, reusing cached results for unchanged files"""
+        files = list(self.get_code_files() if files is None else files)
+        analyses = self._cached_analyses()
+        stamps = [_file_stamp(file_path) for file_path in files]
+        fresh = [self._is_fresh(file_path, stamp) for file_path, stamp in zip(files, stamps)]
+
+        analyzed = self._analyze_files([file_path for file_path, hit in zip(files, fresh) if not hit])
+        try:
+            for file_path, stamp, hit in zip(files, stamps, fresh):
+                if hit:
+                    analysis = dict(analyses[str(file_path)][1])
+                else:
+                    analysis = next(analyzed)
+                    self._remember(file_path, stamp, analysis)
+                yield analysis
+        finally:
+            # Also runs when a consumer stops after the last result without exhausting the generator.
+            # Persist only this run's files, so deleted files drop out of the disk cache
+            kept = {str(file_path): analyses[str(file_path)] for file_path in files if str(file_path) in analyses}
+            if not all(fresh) or len(kept) != len(analyses):
+                self._save_analysis_cache(kept)
+
+    def _cached_analyses(self) -> Dict:
+        if self._analyses is None:
+            self._analyses = self._load_analysis_cache()
+        return self._analyses
+
+    def _is_fresh(self, file_path: Path, stamp: Optional[Tuple[int, int]]) -> bool:
+        entry = self._cached_analyses().get(str(file_path))
+        return stamp is not None and entry is not None and entry[0] == stamp
+
+    def _remember(self, file_path: Path, stamp: Optional[Tuple[int, int]], analysis: Dict):
+        if stamp is not None and 'error' not in analysis:
+            # Copy, since callers add keys such as 'ai_description' to what they receive
+            self._cached_analyses()[str(file_path)] = (stamp, dict(analysis))
+
+    def _analyze_files(self, files: List[Path]) -> Iterator[Dict]:
+        """Analyze files in order, across processes for large batches"""
+        if len(files) < PARALLEL_MIN_FILES:
+            yield from map(self._analyze_source, files)
+            return
+
+        # Workers don't share the content memo, so duplicates are collapsed here and only one
+        # file per (suffix, digest) is sent; unreadable files keep their own path as key
+        keys = [_content_key(file_path) or file_path for file_path in files]
+        representatives = {}
+        for file_path, key in zip(files, keys):
+            representatives.setdefault(key, file_path)
+
+        # Parsing is CPU-bound, so threads would serialize on the GIL
+        workers = os.cpu_count() or 1
+        chunksize = max(1, len(representatives) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Representatives are in first-appearance order, so results arrive just as they're needed
+            results = executor.map(self._analyze_source, list(representatives.values()), chunksize=chunksize)
+            analyses = {}
+            for key in keys:
+                if key not in analyses:
+                    analyses[key] = next(results)
+                    if isinstance(key, tuple) and 'error' not in analyses[key]:
+                        self._analyses_by_content[key] = analyses[key]
+                yield dict(analyses[key])
+
+    def _analysis_cache_file(self) -> Path:
+        key = hashlib.blake2b(str(self.project_path).encode('utf-8'), digest_size=16).hexdigest()
+        return CACHE_DIR / 'analysis' / f"{key}.pkl"
+
+    def _load_analysis_cache(self) -> Dict:
+        """Cached analyses by file path, as (stamp, analysis) pairs"""
+        try:
+            with open(self._analysis_cache_file(), 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return {}
+        if not isinstance(data, dict) or data.get('version') != ANALYSIS_CACHE_VERSION:
+            return {}
+        return data.get('files', {})
+
+    def _save_analysis_cache(self, cache: Dict):
+        cache_file = self._analysis_cache_file()
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'version': ANALYSIS_CACHE_VERSION, 'files': cache}, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass  # Caching is best-effort; a read-only home shouldn't break analysis
 
     def analyze_file(self, file_path: Path) -> Dict:
+        """Analyze one file, reusing the result while its mtime and size are unchanged"""
+        stamp = _file_stamp(file_path)
+        if self._is_fresh(file_path, stamp):
+            return dict(self._cached_analyses()[str(file_path)][1])
+
+        analysis = self._analyze_source(file_path)
+        self._remember(file_path, stamp, analysis)
+        return analysis
+
+    def _analyze_source(self, file_path: Path) -> Dict:
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            # Names are extracted from the raw bytes; ast.parse decodes Python source itself
+            with open(file_path, 'rb') as f:
+                if b'\0' in f.read(BINARY_SNIFF_BYTES):
+                    return {'error': "Binary file"}
+                # Re-read from the start rather than concatenating, which would copy the whole file again
+                f.seek(0)
                 content = f.read()
         except Exception as e:
             return {'error': f"Could not read file: {str(e)}"}
 
-        lines = content.split('\n')
-        return {
-            'functions': self._extract_functions(content, file_path.suffix),
-            'classes': self._extract_classes(content, file_path.suffix),
-            'imports': self._extract_imports(content, file_path.suffix),
-            'lines': len(lines),
-            'language': self._detect_language(file_path.suffix)
-        }
+        # Hashing is far cheaper than parsing, and monorepos repeat vendored and generated files
+        key = _content_key(file_path, content)
+        analysis = self._analyses_by_content.get(key)
+        if analysis is None:
+            names = _python_names(content) if file_path.suffix == '.py' else None
+            if names is None:
+                names = (
+                    self._extract_functions(content, file_path.suffix),
+                    self._extract_classes(content, file_path.suffix),
+                    self._extract_imports(content, file_path.suffix)
+                )
+            functions, classes, imports = names
+            analysis = {
+                'functions': functions,
+                'classes': classes,
+                'imports': imports,
+                'lines': content.count(b'\n') + (0 if not content or content.endswith(b'\n') else 1),
+                'language': self._detect_language(file_path.suffix)
+            }
+            self._analyses_by_content[key] = analysis
+        # Each duplicate gets its own dict, so keys added by callers don't leak between files
+        return dict(analysis)
 
     def _detect_language(self, extension: str) -> str:
-        lang_map = {
-            '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript',
-            '.jsx': 'React JSX', '.tsx': 'React TSX', '.java': 'Java',
-            '.cpp': 'C++', '.c': 'C', '.h': 'C/C++ Header',
-            '.cs': 'C#', '.php': 'PHP', '.rb': 'Ruby',
-            '.go': 'Go', '.rs': 'Rust', '.kt': 'Kotlin',
-            '.swift': 'Swift', '.dart': 'Dart'
-        }
-        return lang_map.get(extension.lower(), 'Unknown')
-
-    def _extract_functions(self, content: str, extension: str) -> List[str]:
-        functions = []
-        if extension == '.py':
-            pattern = r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\('
-            functions.extend(re.findall(pattern, content))
-        elif extension in ['.js', '.ts', '.jsx', '.tsx']:
-            patterns = [
-                r'function\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(',
-                r'const\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*\(',
-                r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=>\s*'
-            ]
-            for pattern in patterns:
-                functions.extend(re.findall(pattern, content))
-        return list(set(functions))
-
-    def _extract_classes(self, content: str, extension: str) -> List[str]:
-        classes = []
-        if extension == '.py':
-            pattern = r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[:\(]'
-            classes.extend(re.findall(pattern, content))
-        elif extension in ['.js', '.ts', '.jsx', '.tsx']:
-            pattern = r'class\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[{]'
-            classes.extend(re.findall(pattern, content))
-        return list(set(classes))
-
-    def _extract_imports(self, content: str, extension: str) -> List[str]:
-        imports = []
-        if extension == '.py':
-            patterns = [
-                r'import\s+([a-zA-Z_][a-zA-Z0-9_.]*)',
-                r'from\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s+import'
-            ]
-            for pattern in patterns:
-                imports.extend(re.findall(pattern, content))
-        elif extension in ['.js', '.ts', '.jsx', '.tsx']:
-            patterns = [
-                r'import.*from\s+[\'"]([^\'"]+)[\'"]',
-                r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'
-            ]
-            for pattern in patterns:
-                imports.extend(re.findall(pattern, content))
-        return list(set(imports))
+        return LANGUAGE_BY_EXTENSION.get(extension.lower(), 'Unknown')
+
+    def _extract_functions(self, content: Union[str, bytes], extension: str) -> List[str]:
+        return _find_names(FUNCTION_PATTERNS.get(extension, ()), content)
+
+    def _extract_classes(self, content: Union[str, bytes], extension: str) -> List[str]:
+        return _find_names(CLASS_PATTERNS.get(extension, ()), content)
+
+    def _extract_imports(self, content: Union[str, bytes], extension: str) -> List[str]:
+        return _find_names(IMPORT_PATTERNS.get(extension, ()), content)
 
     def detect_build_files(self) -> List[Dict]:
-        build_files = []
-        for file_path in self.project_path.glob("**/*"):
-            if file_path.name in {'requirements.txt', 'package.json', 'pyproject.toml'}:
-                build_files.append({
-                    'name': file_path.name,
-                    'path': str(file_path.relative_to(self.project_path))
-                })
-        return build_files
\ No newline at end of file
+        build_files = [
+            {'name': entry.name, 'path': os.path.relpath(entry.path, self.project_path)}
+            for entry in self._walk() if entry.name in BUILD_FILE_NAMES
+        ]
+        return sorted(build_files, key=lambda build_file: build_file['path'])
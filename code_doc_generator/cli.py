@@ -1,7 +1,5 @@
 import argparse
 from pathlib import Path
-from code_doc_generator.analyzer import CodeAnalyzer
-from code_doc_generator.doc_generator import EnhancedDocumentationGenerator
 
 def main():
     parser = argparse.ArgumentParser(description="Code Documentation Generator")
@@ -10,14 +8,23 @@ def main():
     docs_parser = subparser.add_parser("generate", help="Generate documentation")
     docs_parser.add_argument("type", choices=["doc", "structure", "graphs"], help="Type of documentation to generate")
     docs_parser.add_argument("path", help="Path to the project directory or file")
+    docs_parser.add_argument("--max-file-bytes", type=int, default=None,
+                             help="Skip source files larger than this many bytes (default: 2 MiB, 0 for no limit)")
 
     args = parser.parse_args()
 
-    project_path = Path(args.path).resolve()
-    analyzer = CodeAnalyzer(project_path)
-    generator = EnhancedDocumentationGenerator(analyzer)
-
     if args.command == "generate":
+        # Imported here so --help doesn't load the analysis stack
+        from code_doc_generator.analyzer import CodeAnalyzer
+        from code_doc_generator.doc_generator import EnhancedDocumentationGenerator
+
+        project_path = Path(args.path).resolve()
+        if args.max_file_bytes is None:
+            analyzer = CodeAnalyzer(project_path)
+        else:
+            analyzer = CodeAnalyzer(project_path, max_file_bytes=args.max_file_bytes or None)
+        generator = EnhancedDocumentationGenerator(analyzer)
+
         if args.type == "doc":
             result = generator.generate_readme()
             print(f"📝 Generated README: {project_path / 'README.md'}")
@@ -1,16 +1,66 @@
 from pathlib import Path
+import os
+import heapq
+import hashlib
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 from code_doc_generator.analyzer import CodeAnalyzer
 from code_doc_generator.ai_engine import AIDocumentationEngine
 from code_doc_generator.visual_generator import VisualGraphGenerator
 
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Number of files handed to the AI engine per call
+AI_BATCH_SIZE = 8
+
+# Code file suffixes that get an AI description
+AI_SUFFIXES = frozenset({'.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp'})
+
+# Files shorter than this with no classes or functions are described without the AI engine
+TRIVIAL_FILE_LINES = 10
+
+# Bytes of a file read for AI analysis; prompts only use the start of the code anyway
+MAX_AI_BYTES = 64 * 1024
+
+# Files larger than this (usually generated or minified) are not sent to the AI engine
+MAX_AI_FILE_BYTES = 1024 * 1024
+
+# Standard-library imports left out of the dependency lists
+IGNORED_IMPORTS = frozenset({'os', 'sys', 're', 'json', 'typing'})
+
+# Well-known libraries listed first among the key dependencies
+PRIORITY_LIBS = frozenset({'flask', 'django', 'fastapi', 'streamlit', 'pandas', 'numpy',
+                           'matplotlib', 'scikit-learn', 'tensorflow', 'pytorch', 'requests'})
+
+
+def _progress(results, total: int):
+    """Yield results while reporting progress, with tqdm when it is installed"""
+    if tqdm is not None:
+        yield from tqdm(results, total=total, desc="   Processing files")
+        return
+    for i, result in enumerate(results):
+        if i % 5 == 0:  # Progress indicator
+            print(f"   Processing file {i + 1}/{total}...")
+        yield result
+
+
+def _readme_section(heading: str, *lines: str) -> str:
+    """Render a README block: heading, blank line, body lines and a trailing blank line"""
+    return '\n'.join((heading, '', *lines, ''))
+
 
 class EnhancedDocumentationGenerator:
     def __init__(self, analyzer: CodeAnalyzer):
         self.analyzer = analyzer
         self.ai_engine = AIDocumentationEngine()
         self.visual_generator = VisualGraphGenerator('.')
+        # AI descriptions keyed by file name + content hash, see _description_key
+        self._description_cache = {}
+        self._project_analysis = None
+        self._generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     def generate_readme(self) -> str:
         print("🤖 Generating enhanced README.md with AI...")
@@ -31,102 +81,93 @@ class EnhancedDocumentationGenerator:
         """Build a comprehensive, user-friendly README"""
         project_name = self.analyzer.project_name
 
-        readme_parts = []
-
         # Header with project name and description
-        readme_parts.append(f"# {project_name}")
-        readme_parts.append("")
-        readme_parts.append(f"**{ai_overview.get('project_type', 'Software Project')}**")
-        readme_parts.append("")
-        readme_parts.append(ai_overview.get('project_description', 'A well-crafted software project.'))
-        readme_parts.append("")
-
-        # Add badges/stats
+        readme_parts = [_readme_section(
+            f"# {project_name}",
+            f"**{ai_overview.get('project_type', 'Software Project')}**",
+            "",
+            ai_overview.get('project_description', 'A well-crafted software project.')
+        )]
+
+        # Gather stats and dependencies in a single pass over the files
         total_files = project_analysis.get('total_files', 0)
-        languages = set(f.get('analysis', {}).get('language', '') for f in project_analysis.get('files', []))
+        languages = set()
+        total_lines = 0
+        all_imports = set()
+        priority_imports = set()
+        for file_info in project_analysis.get('files', []):
+            analysis = file_info.get('analysis', {})
+            languages.add(analysis.get('language', ''))
+            total_lines += analysis.get('lines', 0)
+            for imp in analysis.get('imports', ()):
+                if not imp.startswith('.') and imp not in IGNORED_IMPORTS:
+                    all_imports.add(imp)
+                    if imp in PRIORITY_LIBS:
+                        priority_imports.add(imp)
         languages.discard('')
-        total_lines = sum(f.get('analysis', {}).get('lines', 0) for f in project_analysis.get('files', []))
 
-        readme_parts.append("## 📊 Project Stats")
-        readme_parts.append("")
-        readme_parts.append(f"- **Files**: {total_files}")
-        readme_parts.append(f"- **Languages**: {', '.join(sorted(languages))}")
-        readme_parts.append(f"- **Lines of Code**: {total_lines:,}")
-        readme_parts.append("")
+        # Add badges/stats
+
+        readme_parts.append(_readme_section(
+            "## 📊 Project Stats",
+            f"- **Files**: {total_files}",
+            f"- **Languages**: {', '.join(sorted(languages))}",
+            f"- **Lines of Code**: {total_lines:,}"
+        ))
 
         # Features section
         features = ai_overview.get('main_features', [])
         if features:
-            readme_parts.append("## ✨ Features")
-            readme_parts.append("")
-            for feature in features:
-                readme_parts.append(f"- {feature}")
-            readme_parts.append("")
+            readme_parts.append(_readme_section("## ✨ Features", *(f"- {feature}" for feature in features)))
 
         # Tech stack
         tech_stack = ai_overview.get('tech_stack', [])
         if tech_stack:
-            readme_parts.append("## 🛠️ Tech Stack")
-            readme_parts.append("")
-            for tech in tech_stack:
-                readme_parts.append(f"- **{tech}**")
-            readme_parts.append("")
+            readme_parts.append(_readme_section("## 🛠️ Tech Stack", *(f"- **{tech}**" for tech in tech_stack)))
 
         # Installation section
         installation_steps = ai_overview.get('installation_steps', [])
-        readme_parts.append("## 🚀 Installation")
-        readme_parts.append("")
-        for i, step in enumerate(installation_steps, 1):
-            readme_parts.append(f"{i}. {step}")
-        readme_parts.append("")
+        readme_parts.append(_readme_section(
+            "## 🚀 Installation", *(f"{i}. {step}" for i, step in enumerate(installation_steps, 1))
+        ))
 
         # Usage section
         usage_instructions = ai_overview.get('usage_instructions', [])
-        readme_parts.append("## 💻 Usage")
-        readme_parts.append("")
-        for instruction in usage_instructions:
-            readme_parts.append(f"- {instruction}")
-        readme_parts.append("")
+        readme_parts.append(_readme_section(
+            "## 💻 Usage", *(f"- {instruction}" for instruction in usage_instructions)
+        ))
 
-        # Project structure
+        # Project structure with a simplified file tree
         structure_explanation = ai_overview.get('project_structure_explanation', '')
         if structure_explanation:
-            readme_parts.append("## 📁 Project Structure")
-            readme_parts.append("")
-            readme_parts.append(structure_explanation)
-            readme_parts.append("")
-
-            # Add simplified file tree
-            readme_parts.append("```")
-            readme_parts.append(self._generate_simple_file_tree(project_analysis))
-            readme_parts.append("```")
-            readme_parts.append("")
+            readme_parts.append(_readme_section(
+                "## 📁 Project Structure",
+                structure_explanation,
+                "",
+                "```",
+                self._generate_simple_file_tree(project_analysis),
+                "```"
+            ))
 
         # Dependencies
-        dependencies = self._extract_key_dependencies(project_analysis)
+        dependencies = self._key_dependencies(all_imports, priority_imports)
         if dependencies:
-            readme_parts.append("## 📦 Key Dependencies")
-            readme_parts.append("")
-            for dep in dependencies[:10]:  # Show top 10
-                readme_parts.append(f"- `{dep}`")
-            readme_parts.append("")
+            readme_parts.append(_readme_section(
+                "## 📦 Key Dependencies", *(f"- `{dep}`" for dep in dependencies[:10])  # Show top 10
+            ))
 
         # Contributing section
-        readme_parts.append("## 🤝 Contributing")
-        readme_parts.append("")
-        readme_parts.append("Contributions are welcome! Please feel free to submit a Pull Request.")
-        readme_parts.append("")
+        readme_parts.append(_readme_section(
+            "## 🤝 Contributing",
+            "Contributions are welcome! Please feel free to submit a Pull Request."
+        ))
 
         # Footer
         target_audience = ai_overview.get('target_audience', '')
         if target_audience:
-            readme_parts.append(f"## 👥 Target Audience")
-            readme_parts.append("")
-            readme_parts.append(target_audience)
-            readme_parts.append("")
+            readme_parts.append(_readme_section("## 👥 Target Audience", target_audience))
 
-        readme_parts.append("---")
-        readme_parts.append(f"*Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
+        readme_parts.append(f"---\n*Generated on: {self._generated_at}*")
 
         return '\n'.join(readme_parts)
 
@@ -137,18 +178,14 @@ class EnhancedDocumentationGenerator:
             return f"{self.analyzer.project_name}/"
 
         # Group files by directory
+        # Paths are relative strings from _process_file, so split them instead of building Paths
         dirs = {}
         for file_info in files:
-            path = Path(file_info['path'])
-            if len(path.parts) > 1:
-                dir_name = path.parts[0]
-                if dir_name not in dirs:
-                    dirs[dir_name] = []
-                dirs[dir_name].append(path.name)
+            head, _, tail = file_info['path'].partition(os.sep)
+            if tail:
+                dirs.setdefault(head, []).append(tail.rsplit(os.sep, 1)[-1])
             else:
-                if 'root' not in dirs:
-                    dirs['root'] = []
-                dirs['root'].append(path.name)
+                dirs.setdefault('root', []).append(head)
 
         # Build tree
         tree_lines = [f"{self.analyzer.project_name}/"]
@@ -169,29 +206,23 @@ class EnhancedDocumentationGenerator:
 
         return '\n'.join(tree_lines)
 
-    def _extract_key_dependencies(self, project_analysis: Dict) -> List[str]:
-        """Extract key dependencies from all files"""
-        all_imports = set()
-        priority_imports = set()
+    def _key_dependencies(self, all_imports: Set[str], priority_imports: Set[str]) -> List[str]:
+        """Order the collected dependencies, well-known libraries first"""
+        # Return priority imports first, then others; only the first 15 are ever shown
+        result = sorted(priority_imports)[:15]
+        result.extend(heapq.nsmallest(15 - len(result), all_imports - priority_imports))
+        return result
 
-        for file_info in project_analysis.get('files', []):
-            imports = file_info.get('analysis', {}).get('imports', [])
-            for imp in imports:
-                if not imp.startswith('.') and imp not in ['os', 'sys', 're', 'json', 'typing']:
-                    all_imports.add(imp)
-
-                    # Prioritize well-known libraries
-                    if imp in ['flask', 'django', 'fastapi', 'streamlit', 'pandas', 'numpy',
-                               'matplotlib', 'scikit-learn', 'tensorflow', 'pytorch', 'requests']:
-                        priority_imports.add(imp)
-
-        # Return priority imports first, then others
-        result = list(priority_imports)
-        result.extend([imp for imp in sorted(all_imports) if imp not in priority_imports])
-        return result[:15]  # Limit to 15 dependencies
+    def invalidate(self):
+        """Forget the cached project analysis so the next call re-reads the project"""
+        self._project_analysis = None
+        self._generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     def _analyze_project(self) -> Dict:
-        """Analyze project with enhanced AI descriptions"""
+        """Analyze project with enhanced AI descriptions, cached for the generator's lifetime"""
+        if self._project_analysis is not None:
+            return self._project_analysis
+
         code_files = self.analyzer.get_code_files()
         project_analysis = {
             'files': [],
@@ -201,35 +232,104 @@ class EnhancedDocumentationGenerator:
 
         print(f"📊 Analyzing {len(code_files)} files...")
 
-        for i, file_path in enumerate(code_files):
-            if i % 5 == 0:  # Progress indicator
-                print(f"   Processing file {i + 1}/{len(code_files)}...")
-
-            analysis = self.analyzer.analyze_file(file_path)
-            if 'error' not in analysis:
-                # Get AI description for code files
-                if file_path.suffix in ['.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp']:
-                    try:
-                        code_content = self._read_file(file_path)
-                        analysis['ai_description'] = self.ai_engine.analyze_code_purpose(
-                            file_path, code_content, analysis
-                        )
-                    except Exception as e:
-                        print(f"⚠️ Could not analyze {file_path.name}: {e}")
-                        analysis['ai_description'] = "Code analysis not available"
-
-                project_analysis['files'].append({
-                    'path': str(file_path.relative_to(self.analyzer.project_path)),
-                    'analysis': analysis
-                })
-
+        pending = []
+        analyses = _progress(self.analyzer.analyze_all(code_files), len(code_files))
+        # analyses comes first so zip exhausts it, letting analyze_all save the disk cache
+        for analysis, file_path in zip(analyses, code_files):
+            result = self._process_file(file_path, analysis)
+            if result is None:
+                continue
+
+            file_info, ai_item = result
+            project_analysis['files'].append(file_info)
+            if ai_item:
+                # Queue code files for AI description, flushed in batches
+                pending.append(ai_item)
+                if len(pending) >= AI_BATCH_SIZE:
+                    self._describe_files(pending)
+                    pending = []
+
+        if pending:
+            self._describe_files(pending)
+
+        self._project_analysis = project_analysis
         return project_analysis
 
+    def _process_file(self, file_path: Path,
+                      analysis: Dict) -> Optional[Tuple[Dict, Optional[Tuple[Path, str, Dict]]]]:
+        """Build a file's entry and, for code files, an AI work item"""
+        if 'error' in analysis:
+            return None
+
+        file_info = {
+            'path': str(file_path.relative_to(self.analyzer.project_path)),
+            'analysis': analysis
+        }
+        if file_path.suffix in AI_SUFFIXES:
+            if self._is_trivial(analysis):
+                analysis['ai_description'] = self._trivial_description(file_path, analysis)
+                return file_info, None
+            try:
+                too_large = file_path.stat().st_size > MAX_AI_FILE_BYTES
+            except OSError:
+                too_large = False
+            if too_large:
+                analysis['ai_description'] = "File too large for AI analysis"
+            else:
+                return file_info, (file_path, self._read_file(file_path), analysis)
+        return file_info, None
+
+    def _is_trivial(self, analysis: Dict) -> bool:
+        """Whether a file is too small for an AI description to add anything"""
+        if analysis.get('classes') or analysis.get('functions'):
+            return False
+        lines = analysis.get('lines', 0)
+        # Short stubs, or files that are nothing but import statements
+        return lines < TRIVIAL_FILE_LINES or lines <= len(analysis.get('imports', ()))
+
+    def _trivial_description(self, file_path: Path, analysis: Dict) -> str:
+        """Describe a trivial file without AI"""
+        lines = analysis.get('lines', 0)
+        imports = analysis.get('imports', [])
+        if file_path.suffix == '.py' and (lines <= len(imports) or
+                                          (file_path.name == '__init__.py' and lines < TRIVIAL_FILE_LINES)):
+            return "Module initialization / re-exports"
+        # Short scripts and configs, and languages whose names aren't extracted, aren't re-exports
+        return self.ai_engine._generate_rule_based_description(file_path.stem, file_path.suffix, [], [], imports, [])
+
+    def _describe_files(self, batch: List[Tuple[Path, str, Dict]]):
+        """Attach AI descriptions to a batch of (file_path, code_content, analysis) items"""
+        keys = [self._description_key(file_path, code_content) for file_path, code_content, _ in batch]
+
+        # Only ask the engine about content it hasn't described yet, once per distinct file
+        todo = {}
+        for key, item in zip(keys, batch):
+            if key not in self._description_cache:
+                todo.setdefault(key, item)
+
+        if todo:
+            try:
+                descriptions = self.ai_engine.analyze_code_purposes_batch(list(todo.values()))
+                self._description_cache.update(zip(todo, descriptions))
+            except Exception as e:
+                names = ', '.join(file_path.name for file_path, _, _ in todo.values())
+                print(f"⚠️ Could not analyze {names}: {e}")
+
+        for key, (_, _, analysis) in zip(keys, batch):
+            analysis['ai_description'] = self._description_cache.get(key, "Code analysis not available")
+
+    def _description_key(self, file_path: Path, code_content: str) -> Tuple[str, bool]:
+        """Cache key for a file's AI description; Gemini and rule-based results are kept apart"""
+        digest = hashlib.blake2b(f"{file_path.name}\0{code_content}".encode('utf-8', 'ignore'), digest_size=16)
+        return digest.hexdigest(), self.ai_engine.gemini_model is not None
+
     def _read_file(self, file_path: Path) -> str:
-        """Safely read file content"""
+        """Safely read file content, up to MAX_AI_BYTES"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            if file_path.stat().st_size <= MAX_AI_BYTES:
+                return file_path.read_text(encoding='utf-8', errors='ignore')
+            with file_path.open('rb') as f:
+                return f.read(MAX_AI_BYTES).decode('utf-8', errors='ignore')
         except Exception:
             return ""
 
@@ -238,9 +338,13 @@ class EnhancedDocumentationGenerator:
         """Generate graphs for a specific file"""
         print(f"🎯 Generating graphs for {file_path}...")
         target_path = Path(file_path)
-        if not target_path.exists():
+        # Relative paths are tried from the working directory first, then under the project;
+        # each distinct location is stat'ed at most once
+        found = target_path.exists()
+        if not found and not target_path.is_absolute():
             target_path = self.analyzer.project_path / file_path
-        if not target_path.exists():
+            found = target_path.exists()
+        if not found:
             return f"Error: File '{file_path}' not found"
 
         analysis = self.analyzer.analyze_file(target_path)
@@ -268,9 +372,11 @@ class EnhancedDocumentationGenerator:
 
     def _analyze_architecture(self, project_analysis: Dict) -> str:
         """Legacy method - kept for compatibility"""
-        total_classes = sum(len(f.get('analysis', {}).get('classes', [])) for f in project_analysis.get('files', []))
-        total_functions = sum(
-            len(f.get('analysis', {}).get('functions', [])) for f in project_analysis.get('files', []))
+        total_classes = total_functions = 0
+        for file_info in project_analysis.get('files', ()):
+            analysis = file_info.get('analysis') or {}
+            total_classes += len(analysis.get('classes', ()))
+            total_functions += len(analysis.get('functions', ()))
         if total_classes > total_functions * 0.3:
             return "Object-Oriented with strong class hierarchy"
         elif total_functions > total_classes * 3:
@@ -297,5 +403,5 @@ class EnhancedDocumentationGenerator:
         for file_info in project_analysis.get('files', []):
             imports = file_info.get('analysis', {}).get('imports', [])
             all_imports.update(
-                imp for imp in imports if not imp.startswith('.') and imp not in ['os', 'sys', 're', 'json'])
+                imp for imp in imports if not imp.startswith('.') and imp not in IGNORED_IMPORTS)
         return '\n'.join([f"- `{imp}`" for imp in sorted(all_imports)[:10]]) or "No external dependencies detected."
\ No newline at end of file
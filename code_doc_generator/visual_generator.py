@@ -1,29 +1,73 @@
-import matplotlib.pyplot as plt
-import networkx as nx
-import numpy as np
+import importlib.util
+from collections import defaultdict
+from itertools import count
 from pathlib import Path
 import zipfile
+import json
 import os
+import shutil
 import subprocess
+import sys
 import tempfile
 from typing import Dict, List
 
+# matplotlib and numpy are imported on first use, so text-only commands don't pay for them
+HAS_MATPLOTLIB = importlib.util.find_spec('matplotlib') is not None
+
+
+def _pyplot():
+    """Import pyplot with the non-interactive Agg backend"""
+    import matplotlib
+    matplotlib.use("Agg")  # Graphs are only saved to files; skip interactive GUI backends
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# Screen-sized PNGs with fast, light zlib compression and no metadata chunk
+SAVEFIG_OPTIONS = {
+    'dpi': 120,
+    'pil_kwargs': {'compress_level': 1, 'optimize': False},
+    'metadata': {'Software': None}
+}
+
+# Dependency graphs are only shapes and text, so they're written as vector SVG without rasterizing
+SVG_SAVEFIG_OPTIONS = {
+    'format': 'svg',
+    'metadata': {'Date': None}
+}
+
+# Seconds a script may run while its plots are captured
+PLOT_TIMEOUT_SECONDS = 60
+
+# Runs a script in a child process and saves every figure it leaves open.
+# run_name isn't '__main__', so the script's entry point (servers, CLIs, prompts) is skipped
+PLOT_RUNNER = """
+import json, os, runpy, sys
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+script, out_dir, options = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+sys.argv = [script]
 try:
-    import matplotlib.patches as patches
-    from matplotlib.patches import FancyBboxPatch
-    HAS_MATPLOTLIB = True
-except ImportError:
-    HAS_MATPLOTLIB = False
+    runpy.run_path(script, run_name='__plot__')
+finally:
+    for i, num in enumerate(plt.get_fignums()):
+        plt.figure(num).savefig(os.path.join(out_dir, f'plot_{i}.png'), **options)
+"""
 
 class VisualGraphGenerator:
     def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         if not HAS_MATPLOTLIB:
-            print("⚠️ matplotlib not available. Install with: pip install matplotlib networkx")
+            print("⚠️ matplotlib not available. Install with: pip install matplotlib")
 
     def create_project_structure_text(self, project_analysis: Dict, project_root: Path) -> str:
         """Generate a text-based directory tree structure with file descriptions."""
+        # One dict lookup per entry instead of scanning every analyzed file
+        files_by_path = {file_info.get('path'): file_info for file_info in project_analysis.get('files', [])}
+
         def build_tree(directory: Path, prefix: str = "", level: int = 0) -> List[str]:
             lines = []
             entries = sorted(directory.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
@@ -35,14 +79,13 @@ class VisualGraphGenerator:
                 # Get description from project_analysis
                 rel_path = str(entry.relative_to(project_root))
                 description = ""
-                for file_info in project_analysis.get('files', []):
-                    if file_info.get('path') == rel_path:
-                        analysis = file_info.get('analysis', {})
-                        if 'ai_description' in analysis:
-                            description = f"  # {analysis['ai_description'].splitlines()[0]}"
-                        elif 'language' in analysis:
-                            description = f"  # {analysis['language']} file"
-                        break
+                file_info = files_by_path.get(rel_path)
+                if file_info is not None:
+                    analysis = file_info.get('analysis', {})
+                    if 'ai_description' in analysis:
+                        description = f"  # {analysis['ai_description'].splitlines()[0]}"
+                    elif 'language' in analysis:
+                        description = f"  # {analysis['language']} file"
                 else:
                     if entry.is_dir():
                         description = "  # Directory"
@@ -70,6 +113,11 @@ class VisualGraphGenerator:
         if not HAS_MATPLOTLIB:
             return "matplotlib not available"
 
+        import numpy as np
+        from matplotlib.collections import PatchCollection
+        from matplotlib.patches import FancyBboxPatch
+        plt = _pyplot()
+
         fig, ax = plt.subplots(figsize=(12, 8))
         ax.set_xlim(0, 10)
         ax.set_ylim(0, 10)
@@ -77,18 +125,19 @@ class VisualGraphGenerator:
 
         fig.suptitle(f'{project_name} - Project Structure', fontsize=16, fontweight='bold')
 
-        files_by_lang = {}
+        files_by_lang = defaultdict(list)
         for file_info in project_analysis.get('files', []):
-            lang = file_info.get('analysis', {}).get('language', 'Unknown')
-            files_by_lang.setdefault(lang, []).append(file_info)
+            files_by_lang[file_info.get('analysis', {}).get('language', 'Unknown')].append(file_info)
 
         colors = plt.cm.Set3(np.linspace(0, 1, len(files_by_lang)))
         y_pos = 9
+        # Boxes are collected and added as one PatchCollection instead of one artist each
+        boxes, face_colors, edge_colors = [], [], []
 
         for i, (lang, files) in enumerate(files_by_lang.items()):
-            lang_box = patches.FancyBboxPatch((0.5, y_pos - 0.3), 2, 0.6, boxstyle="round,pad=0.1",
-                                             facecolor=colors[i], edgecolor='black')
-            ax.add_patch(lang_box)
+            boxes.append(FancyBboxPatch((0.5, y_pos - 0.3), 2, 0.6, boxstyle="round,pad=0.1"))
+            face_colors.append(colors[i])
+            edge_colors.append('black')
             ax.text(1.5, y_pos, lang, ha='center', va='center', fontsize=12, fontweight='bold')
 
             x_pos = 3.5
@@ -98,9 +147,9 @@ class VisualGraphGenerator:
                 if len(file_name) > 12:
                     file_name = file_name[:9] + "..."
 
-                file_box = patches.FancyBboxPatch((x_pos, y_pos - 0.25), 1.2, 0.5, boxstyle="round,pad=0.05",
-                                                 facecolor='lightblue', edgecolor='navy')
-                ax.add_patch(file_box)
+                boxes.append(FancyBboxPatch((x_pos, y_pos - 0.25), 1.2, 0.5, boxstyle="round,pad=0.05"))
+                face_colors.append('lightblue')
+                edge_colors.append('navy')
                 ax.text(x_pos + 0.6, y_pos, file_name, ha='center', va='center', fontsize=8)
 
                 x_pos += 1.4
@@ -110,9 +159,11 @@ class VisualGraphGenerator:
             if y_pos < 1:
                 break
 
+        ax.add_collection(PatchCollection(boxes, facecolors=face_colors, edgecolors=edge_colors))
+
         output_path = self.output_dir / f'{project_name}_structure.png'
         plt.tight_layout()
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        plt.savefig(output_path, bbox_inches='tight', **SAVEFIG_OPTIONS)
         plt.close()
         return str(output_path)
 
@@ -120,41 +171,61 @@ class VisualGraphGenerator:
         if not HAS_MATPLOTLIB:
             return "matplotlib not available"
 
-        G = nx.DiGraph()
+        import numpy as np
+        plt = _pyplot()
+
+        # Node type by name; a later role overrides an earlier one, as before
         file_name = Path(file_path).stem
-        G.add_node(file_name, node_type='main', color='red')
+        nodes = {file_name: 'main'}
+        edges = []
 
         for imp in analysis.get('imports', [])[:10]:
             clean_imp = imp.split('.')[-1] if '.' in imp else imp
-            G.add_node(clean_imp, node_type='import', color='lightblue')
-            G.add_edge(clean_imp, file_name)
+            nodes[clean_imp] = 'import'
+            edges.append((clean_imp, file_name))
 
-        for cls in analysis.get('classes', [])[:5]:
-            G.add_node(cls, node_type='class', color='lightgreen')
-            G.add_edge(file_name, cls)
+        classes = analysis.get('classes', [])
+        for cls in classes[:5]:
+            nodes[cls] = 'class'
+            edges.append((file_name, cls))
 
+        class_names = set(classes)
         for func in analysis.get('functions', [])[:8]:
-            if func not in analysis.get('classes', []):
-                G.add_node(func, node_type='function', color='lightyellow')
-                G.add_edge(file_name, func)
+            if func not in class_names:
+                nodes[func] = 'function'
+                edges.append((file_name, func))
 
-        plt.figure(figsize=(10, 8))
-        pos = nx.spring_layout(G, k=3, iterations=50)
         node_colors = {'main': 'red', 'import': 'lightblue', 'class': 'lightgreen', 'function': 'lightyellow'}
+        # The graph is a star around the file: place each node type on its own ring
+        rings = [[n for n, t in nodes.items() if t == node_type] for node_type in node_colors]
+        rings = [ring for ring in rings if ring]
+        pos = {}
+        for radius, ring in enumerate(rings, 0 if len(rings[0]) == 1 else 1):
+            angles = np.linspace(0, 2 * np.pi, len(ring), endpoint=False)
+            pos.update(zip(ring, zip(radius * np.cos(angles), radius * np.sin(angles))))
 
-        for node_type, color in node_colors.items():
-            nodes = [n for n in G.nodes() if G.nodes[n].get('node_type') == node_type]
-            if nodes:
-                nx.draw_networkx_nodes(G, pos, nodelist=nodes, node_color=color, node_size=2000, alpha=0.8)
+        plt.figure(figsize=(10, 8))
+        ax = plt.gca()
+        for source, target in dict.fromkeys(edges):
+            if source != target:
+                ax.annotate('', xy=pos[target], xytext=pos[source], zorder=1,
+                            arrowprops=dict(arrowstyle='-|>', color='gray', mutation_scale=20, shrinkA=25, shrinkB=25))
 
-        nx.draw_networkx_edges(G, pos, edge_color='gray', arrows=True, arrowsize=20)
-        nx.draw_networkx_labels(G, pos, font_size=8, font_weight='bold')
+        for node_type, color in node_colors.items():
+            xs = [pos[n][0] for n, t in nodes.items() if t == node_type]
+            ys = [pos[n][1] for n, t in nodes.items() if t == node_type]
+            if xs:
+                ax.scatter(xs, ys, c=color, s=2000, alpha=0.8, zorder=2)
+
+        for node, (x, y) in pos.items():
+            ax.text(x, y, node, ha='center', va='center', fontsize=8, fontweight='bold', zorder=3)
+        ax.margins(0.15)
         plt.title(f'Dependency Graph: {file_name}', fontsize=14, fontweight='bold')
         plt.axis('off')
 
-        output_path = self.output_dir / f'{project_name}_{file_name}_deps.png'
+        output_path = self.output_dir / f'{project_name}_{file_name}_deps.svg'
         plt.tight_layout()
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        plt.savefig(output_path, bbox_inches='tight', **SVG_SAVEFIG_OPTIONS)
         plt.close()
         return str(output_path)
 
@@ -166,34 +237,37 @@ class VisualGraphGenerator:
         if not files:
             return "No files to analyze"
 
-        file_names, complexity_scores, line_counts = [], [], []
-        for file_info in files[:20]:
+        import numpy as np
+        plt = _pyplot()
+
+        shown = files[:20]
+        file_names = []
+        line_counts = np.empty(len(shown), dtype=np.int64)
+        class_counts = np.empty(len(shown), dtype=np.int64)
+        function_counts = np.empty(len(shown), dtype=np.int64)
+        for i, file_info in enumerate(shown):
             path = file_info.get('path', 'unknown')
             analysis = file_info.get('analysis', {})
             file_name = Path(path).stem
             if len(file_name) > 15:
                 file_name = file_name[:12] + "..."
 
-            lines = analysis.get('lines', 0)
-            classes = len(analysis.get('classes', []))
-            functions = len(analysis.get('functions', []))
-            complexity = (lines * 0.1) + (classes * 5) + (functions * 2)
-
             file_names.append(file_name)
-            complexity_scores.append(complexity)
-            line_counts.append(lines)
+            line_counts[i] = analysis.get('lines', 0)
+            class_counts[i] = len(analysis.get('classes', []))
+            function_counts[i] = len(analysis.get('functions', []))
+
+        complexity_scores = line_counts * 0.1 + class_counts * 5 + function_counts * 2
 
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 8))
-        complexity_matrix = np.array(complexity_scores).reshape(-1, 1)
-        im1 = ax1.imshow(complexity_matrix, cmap='YlOrRd', aspect='auto')
+        im1 = ax1.imshow(complexity_scores[:, np.newaxis], cmap='YlOrRd', aspect='auto')
         ax1.set_yticks(range(len(file_names)))
         ax1.set_yticklabels(file_names)
         ax1.set_xticks([])
         ax1.set_title('Code Complexity Score')
         plt.colorbar(im1, ax=ax1)
 
-        lines_matrix = np.array(line_counts).reshape(-1, 1)
-        im2 = ax2.imshow(lines_matrix, cmap='Blues', aspect='auto')
+        im2 = ax2.imshow(line_counts[:, np.newaxis], cmap='Blues', aspect='auto')
         ax2.set_yticks(range(len(file_names)))
         ax2.set_yticklabels(file_names)
         ax2.set_xticks([])
@@ -203,7 +277,7 @@ class VisualGraphGenerator:
         plt.suptitle(f'{project_name} - Code Metrics', fontsize=14)
         output_path = self.output_dir / f'{project_name}_complexity.png'
         plt.tight_layout()
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        plt.savefig(output_path, bbox_inches='tight', **SAVEFIG_OPTIONS)
         plt.close()
         return str(output_path)
 
@@ -216,33 +290,27 @@ class VisualGraphGenerator:
 
         output_paths = []
         with tempfile.TemporaryDirectory() as tmpdir:
-            wrapper_script = Path(tmpdir) / 'run_plots.py'
-            with open(wrapper_script, 'w') as f:
-                f.write(f"""
-import matplotlib.pyplot as plt
-import os
-plt.switch_backend('Agg')  # Non-interactive backend
-try:
-    with open('{file_path}') as f:
-        code = f.read()
-    exec(code, {{'plt': plt}})
-    for i, fig in enumerate(plt.get_fignums()):
-        plt.figure(i)
-        plt.savefig(os.path.join('{tmpdir}', f'plot_{{i}}.png'))
-        plt.close()
-except Exception:
-    pass
-""")
+            # A separate process keeps the script's side effects and crashes out of the CLI
             try:
-                subprocess.run(['python', str(wrapper_script)], check=True, capture_output=True)
-                for i in range(100):  # Arbitrary limit
-                    plot_path = Path(tmpdir) / f'plot_{i}.png'
-                    if plot_path.exists():
-                        dest_path = self.output_dir / f'{project_name}_plot_{i}.png'
-                        os.rename(plot_path, dest_path)
-                        output_paths.append(str(dest_path))
-            except subprocess.CalledProcessError:
-                pass
+                result = subprocess.run(
+                    [sys.executable, '-c', PLOT_RUNNER, file_path, tmpdir, json.dumps(SAVEFIG_OPTIONS)],
+                    stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=PLOT_TIMEOUT_SECONDS
+                )
+            except subprocess.TimeoutExpired:
+                print(f"⚠️ {Path(file_path).name} ran longer than {PLOT_TIMEOUT_SECONDS}s; skipping its plots")
+                return []
+            if result.returncode != 0:
+                error = result.stderr.strip().splitlines()
+                print(f"⚠️ {Path(file_path).name} exited with status {result.returncode}: {error[-1] if error else ''}")
+
+            # Figures drawn before a failure are still saved by the runner
+            for i in count():
+                plot_path = Path(tmpdir) / f'plot_{i}.png'
+                if not plot_path.exists():
+                    break
+                dest_path = self.output_dir / f'{project_name}_plot_{i}.png'
+                shutil.move(str(plot_path), str(dest_path))
+                output_paths.append(str(dest_path))
         return output_paths
 
     def create_graph_zip(self, file_path: str, analysis: Dict, project_name: str) -> str:
@@ -256,8 +324,10 @@ except Exception:
         graphs.extend(self.extract_plots_from_file(file_path, project_name))
 
         zip_path = self.output_dir / f'{project_name}_graphs.zip'
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        # PNGs are already deflate-compressed, so only the text-based SVGs are worth compressing
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zipf:
             for graph in graphs:
                 if os.path.exists(graph):
-                    zipf.write(graph, os.path.basename(graph))
+                    compress_type = zipfile.ZIP_DEFLATED if graph.endswith('.svg') else zipfile.ZIP_STORED
+                    zipf.write(graph, os.path.basename(graph), compress_type=compress_type)
         return str(zip_path)
\ No newline at end of file
@@ -1,5 +1,10 @@
+import tempfile
 import unittest
-from code_doc_generator.analyzer import CodeAnalyzer
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from code_doc_generator.analyzer import CodeAnalyzer, _python_names
+from code_doc_generator.cli import main
 from pathlib import Path
 from typing import List
 
@@ -27,5 +32,73 @@ class TestCodeAnalyzer(unittest.TestCase):
         self.assertTrue(self.analyzer.should_ignore_path(Path("README.md")))
         self.assertFalse(self.analyzer.should_ignore_path(Path("src/main.py")))
 
+    def test_python_names(self):
+        content = "import os.path\nfrom . import utils\nfrom flask import Flask\n\nclass App:\n    async def run(self):\n        pass\n"
+        functions, classes, imports = _python_names(content)
+        self.assertEqual(functions, ["run"])
+        self.assertEqual(classes, ["App"])
+        self.assertEqual(imports, ["os.path", ".", "flask"])
+        self.assertIsNone(_python_names("def broken(:"))
+
+    def test_python_names_silences_compile_warnings(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            functions, _, _ = _python_names("def parse():\n    return '\\d+'\n")
+        self.assertEqual(functions, ["parse"])
+
+    def test_python_names_source_order(self):
+        content = "class A:\n    def method(self):\n        pass\n\ndef later():\n    pass\n"
+        functions, _, _ = _python_names(content)
+        self.assertEqual(functions, ["method", "later"])
+
+    def _analyze_duplicates(self, project_dir: str) -> List[dict]:
+        source = "import os\n\n\ndef main():\n    pass\n"
+        files = [Path(project_dir) / name for name in ("a.py", "b.py", "c.py")]
+        files[0].write_text(source)
+        files[1].write_text(source)
+        files[2].write_text(source + "\n\ndef other():\n    pass\n")
+        analyzer = CodeAnalyzer(project_dir)
+        with patch.object(CodeAnalyzer, '_analyze_source', autospec=True,
+                          side_effect=CodeAnalyzer._analyze_source) as mock_analyze, \
+                patch('code_doc_generator.analyzer._python_names', wraps=_python_names) as mock_names:
+            analyses = list(analyzer._analyze_files(files))
+        self.assertEqual(mock_names.call_count, 2)
+        self.assertEqual(analyses[0], analyses[1])
+        self.assertIsNot(analyses[0], analyses[1])
+        self.assertEqual(analyses[2]['functions'], ["main", "other"])
+        return mock_analyze
+
+    def test_identical_files_analyzed_once(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            self._analyze_duplicates(project_dir)
+
+    def test_identical_files_sent_to_pool_once(self):
+        # Threads stand in for processes so the calls can be counted
+        with tempfile.TemporaryDirectory() as project_dir, \
+                patch('code_doc_generator.analyzer.PARALLEL_MIN_FILES', 1), \
+                patch('code_doc_generator.analyzer.ProcessPoolExecutor', ThreadPoolExecutor):
+            self.assertEqual(self._analyze_duplicates(project_dir).call_count, 2)
+
+    def test_binary_file_skipped(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            path = Path(project_dir) / "blob.py"
+            path.write_bytes(b"x = 1\n\0" + b"y" * 1000)
+            self.assertEqual(CodeAnalyzer(project_dir)._analyze_source(path), {'error': 'Binary file'})
+
+    def test_max_file_bytes(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            (Path(project_dir) / "small.py").write_text("x = 1\n")
+            (Path(project_dir) / "large.py").write_text("x = 1\n" * 500)
+            names = lambda analyzer: [path.name for path in analyzer.get_code_files()]
+            self.assertEqual(names(CodeAnalyzer(project_dir, max_file_bytes=1024)), ["small.py"])
+            self.assertEqual(names(CodeAnalyzer(project_dir, max_file_bytes=None)), ["large.py", "small.py"])
+
+            # --max-file-bytes 0 on the command line means no limit
+            argv = ["code-doc", "generate", "structure", project_dir, "--max-file-bytes", "0"]
+            with patch("sys.argv", argv), patch("code_doc_generator.analyzer.CodeAnalyzer") as mock_analyzer, \
+                    patch("code_doc_generator.doc_generator.EnhancedDocumentationGenerator"):
+                main()
+            self.assertIsNone(mock_analyzer.call_args.kwargs["max_file_bytes"])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
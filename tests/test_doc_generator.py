@@ -1,5 +1,7 @@
+import tempfile
 import unittest
 from unittest.mock import patch
+from pathlib import Path
 from code_doc_generator.analyzer import CodeAnalyzer
 from code_doc_generator.doc_generator import EnhancedDocumentationGenerator
 
@@ -11,12 +13,18 @@ class TestEnhancedDocumentationGenerator(unittest.TestCase):
     @patch('code_doc_generator.doc_generator.AIDocumentationEngine.analyze_code_purpose')
     def test_generate_readme(self, mock_analyze):
         mock_analyze.return_value = "**Purpose**: Mocked purpose"
-        readme = self.doc_generator.generate_readme()
-        self.assertIn(f"# {self.analyzer.project_name}", readme)
-        self.assertIn("## Overview", readme)
-        self.assertIn("## Installation", readme)
-        self.assertIn("## Dependencies", readme)
-        self.assertIn("## File Analysis", readme)
+        # generate_readme writes README.md into the project, so use a throwaway one
+        with tempfile.TemporaryDirectory() as project_dir:
+            (Path(project_dir) / "main.py").write_text("import requests\n\n\ndef main():\n    requests.get('https://example.com')\n")
+            analyzer = CodeAnalyzer(project_dir)
+            readme = EnhancedDocumentationGenerator(analyzer).generate_readme()
+            self.assertTrue((Path(project_dir) / "README.md").exists())
+        self.assertIn(f"# {analyzer.project_name}", readme)
+        self.assertIn("## 📊 Project Stats", readme)
+        self.assertIn("## 🚀 Installation", readme)
+        self.assertIn("## 📁 Project Structure", readme)
+        self.assertIn("## 📦 Key Dependencies", readme)
+        self.assertIn("- `requests`", readme)
 
     def test_generate_project_summary(self):
         project_analysis = {
@@ -39,5 +47,42 @@ class TestEnhancedDocumentationGenerator(unittest.TestCase):
         self.assertIn("**Languages**: Python", summary)  # Updated to match Markdown
         self.assertIn("**Scale**: 1 files, 100 lines of code", summary)
 
+    @patch('code_doc_generator.doc_generator.AIDocumentationEngine.analyze_code_purposes_batch')
+    def test_describe_files_reuses_descriptions(self, mock_batch):
+        mock_batch.side_effect = lambda items: ["**Purpose**: Mocked purpose"] * len(items)
+        first, second = {}, {}
+        batch = [(Path("a.py"), "x = 1", first), (Path("a.py"), "x = 1", second)]
+        self.doc_generator._describe_files(batch)
+        self.doc_generator._describe_files(batch)
+        self.assertEqual(mock_batch.call_count, 1)
+        self.assertEqual(len(mock_batch.call_args[0][0]), 1)
+        self.assertEqual(second['ai_description'], "**Purpose**: Mocked purpose")
+
+    def test_is_trivial(self):
+        self.assertTrue(self.doc_generator._is_trivial({'lines': 3, 'imports': ['os']}))
+        self.assertTrue(self.doc_generator._is_trivial({'lines': 12, 'imports': [f'm{i}' for i in range(12)]}))
+        self.assertFalse(self.doc_generator._is_trivial({'lines': 3, 'functions': ['main']}))
+        self.assertFalse(self.doc_generator._is_trivial({'lines': 40, 'imports': ['os']}))
+
+    def test_trivial_description(self):
+        reexports = "Module initialization / re-exports"
+        describe = self.doc_generator._trivial_description
+        self.assertEqual(describe(Path("pkg/__init__.py"), {'lines': 3, 'imports': ['.core']}), reexports)
+        self.assertEqual(describe(Path("pkg/api.py"), {'lines': 2, 'imports': ['os', 'sys']}), reexports)
+        self.assertNotEqual(describe(Path("settings.py"), {'lines': 4, 'imports': []}), reexports)
+        self.assertNotEqual(describe(Path("Main.java"), {'lines': 6, 'imports': []}), reexports)
+
+    def test_analyze_project_saves_analysis_cache(self):
+        with tempfile.TemporaryDirectory() as project_dir, tempfile.TemporaryDirectory() as cache_dir, \
+                patch('code_doc_generator.analyzer.CACHE_DIR', Path(cache_dir)):
+            (Path(project_dir) / "main.py").write_text("import os\n\n\ndef main():\n    print(os.getcwd())\n")
+            EnhancedDocumentationGenerator(CodeAnalyzer(project_dir))._analyze_project()
+
+            # A fresh analyzer, as in the next CLI run, should be served from disk
+            with patch.object(CodeAnalyzer, '_analyze_source') as mock_analyze:
+                analyses = list(CodeAnalyzer(project_dir).analyze_all())
+            mock_analyze.assert_not_called()
+            self.assertEqual(analyses[0]['functions'], ['main'])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file